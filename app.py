@@ -1,173 +1,373 @@
 # app.py (Gemini Version with VALIDATION)
 import streamlit as st
 import os
+import time
+import random
+import functools
+import logging
+import queue
+import threading
+from concurrent.futures import Future
 import json
+import re
+import httpx
+import numpy as np
+from pathlib import Path
 from dotenv import load_dotenv
 from datetime import datetime
 import google.generativeai as genai
+from google import genai as google_genai
+from google.genai import errors as genai_errors
+from mcq_spec import (
+    MCQ_SYSTEM_INSTRUCTION, MCQ_GENERATION_CONFIG, GENAI_MCQ_GENERATION_CONFIG, QUIZ_DIR,
+    build_mcq_prompt, check_mcqs, slugify
+)
+
+logger = logging.getLogger(__name__)
 
 # -------------------- LOAD ENV --------------------
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "models/gemini-2.0-flash")
 
+# Batch API: half the token cost, but the quiz arrives after polling instead of inline.
+USE_BATCH_API = os.getenv("GEMINI_USE_BATCH", "0") == "1"
+BATCH_POLL_SECONDS = int(os.getenv("GEMINI_BATCH_POLL_SECONDS", "5"))
+# Requests from all sessions arriving within this window share one batch job.
+BATCH_WINDOW_SECONDS = float(os.getenv("GEMINI_BATCH_WINDOW_SECONDS", "0.5"))
+# A session stops waiting on its batch job after this long.
+BATCH_TIMEOUT_SECONDS = int(os.getenv("GEMINI_BATCH_TIMEOUT_SECONDS", "1800"))
+
 if not GEMINI_API_KEY:
     st.error("Missing GEMINI_API_KEY in .env file.")
     st.stop()
 
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel(GEMINI_MODEL)
+
+# -------------------- MODEL SETUP --------------------
+# Shared by every session and rerun. The static spec goes in as a system
+# instruction; this only separates it from the per-role prompt. It is still sent
+# and billed with every request, since the spec is below the minimum size for
+# explicit context caching.
+@st.cache_resource(show_spinner=False)
+def get_model():
+    genai.configure(api_key=GEMINI_API_KEY)
+    return genai.GenerativeModel(
+        GEMINI_MODEL,
+        system_instruction=MCQ_SYSTEM_INSTRUCTION,
+        generation_config=MCQ_GENERATION_CONFIG
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_batch_client():
+    return google_genai.Client(api_key=GEMINI_API_KEY)
+
+
+model = get_model()
 
 
 # -------------------- UI SETUP --------------------
 st.set_page_config(page_title="intervAI — AI Interview Agent", page_icon="🤖", layout="wide")
 
-st.markdown("""
-<style>
-
-html, body, .stApp {
-    background-color:#0d0d0d !important;
-    color:white !important;
-    width:100% !important;
-    height:100% !important;
-    margin:0 !important;
-    padding:0 !important;
-}
-
-.block-container {
-    max-width: 100% !important;
-    padding-left: 40px !important;
-    padding-right: 40px !important;
-}
-
-@media (max-width: 768px) {
-    .block-container {
-        padding-left: 15px !important;
-        padding-right: 15px !important;
-    }
-}
-
-.chat-card { 
-    background:#1a1a1a; 
-    color:white;
-    border-radius:14px; 
-    padding:18px; 
-    margin-bottom:16px; 
-    border:1px solid #333;
-}
-
-.question { 
-    font-weight:700; 
-    margin-bottom:10px;
-    font-size:1.1rem;
-    color:white;
-}
-
-.stRadio label {
-    color:white !important;
-    font-size:1rem;
-}
-
-.section-title {
-    font-size:1.4rem;
-    font-weight:700;
-    margin-top:25px;
-    margin-bottom:5px;
-    color:#4ade80;
-}
-
-.line {
-    border-bottom:1px solid #333;
-    margin-bottom:20px;
-}
-
-.small-muted { 
-    color:#9ca3af; 
-    font-size:0.9rem; 
-}
-
-</style>
-""", unsafe_allow_html=True)
+
+# Base colours come from the [theme] in .streamlit/config.toml, which Streamlit
+# sends once per page load; only the layout and card rules are injected here.
+# The <style> block itself has to be re-sent on every rerun: Streamlit serves
+# static .css as text/plain (so a <link> is ignored) and drops any element a
+# rerun does not redraw. Caching at least skips the disk read.
+@st.cache_resource(show_spinner=False)
+def load_css():
+    """Reads static/app.css once per process."""
+    return (Path(__file__).parent / "static" / "app.css").read_text(encoding="utf-8")
+
+
+st.markdown(f"<style>\n{load_css()}</style>", unsafe_allow_html=True)
 
 
 # -------------------- ROLE VALIDATION --------------------
-def is_valid_role(text: str) -> bool:
-    """Uses Gemini to check whether the text is a valid job role."""
+# Cheap local checks that reject obvious non-roles before any Gemini call.
+_INVALID_PATTERNS = re.compile(r"^(hi|hello|hey|test|asdf\w*|\d+)$", re.I)
+_GREETINGS = frozenset({"hi", "hello", "hey", "yo", "sup", "test", "lol", "ok", "thanks"})
+_STOPWORDS = frozenset({"a", "an", "the", "of", "and", "or", "in", "on", "at", "to", "for", "is", "i", "am", "my"})
 
-    validate_prompt = f"""
-Is "{text}" a valid professional job role?
 
-Job role = A real profession like: Data Scientist, Accountant, Software Engineer, Doctor, Nurse, Teacher.
+def is_obviously_invalid_role(text: str) -> bool:
+    """True for greetings, numbers and other inputs that cannot be a job role."""
+    text = text.strip()
 
-Invalid = random words, greetings, names, slang, sentences, nonsense.
+    # two characters can be a whole role, e.g. "医生" or acronyms like "HR", so only
+    # short lowercase / mixed-case ASCII is junk
+    if len(text) < 3 and text.isascii() and not text.isupper():
+        return True
 
-Return ONLY JSON:
-{{
- "valid": true/false
-}}
-"""
+    if text.casefold() in _GREETINGS or _INVALID_PATTERNS.match(text):
+        return True
 
+    words = [w for w in re.findall(r"[^\W\d_]+", text.casefold()) if w not in _STOPWORDS]
+    return not any(len(w) >= 2 or not w.isascii() for w in words)
+
+
+# -------------------- GEMINI FUNCTIONS --------------------
+# Each role keeps up to this many distinct quizzes; a random one is served.
+MCQ_POOL_SIZE = 10
+# Tries per quiz when Gemini's response fails the local schema check.
+MCQ_MAX_ATTEMPTS = 2
+
+# Rejected roles are remembered per role (not per pool slot) for this long.
+# Gemini's verdict is not deterministic, so a role is only blocked once it has
+# been rejected this many times within the TTL.
+REJECTED_ROLE_TTL_SECONDS = 600
+REJECTED_ROLE_STRIKES = 2
+REJECTED_ROLE_MAX_ENTRIES = 1024
+
+
+class InvalidRoleError(Exception):
+    """Gemini judged the role not to be a real profession."""
+
+
+@st.cache_resource(show_spinner=False)
+def get_rejected_roles():
+    """Process-wide {role_norm: (strikes, first_rejected_at)} shared by every session."""
+    return {}
+
+
+def _stream_mcqs(prompt, n_total, progress):
+    # stream so the user sees questions arriving instead of a frozen spinner
+    chunks = []
+    for chunk in model.generate_content(prompt, stream=True):
+        chunks.append(chunk.text)
+        done = min("".join(chunks).count('"answer"'), n_total)
+        progress.progress(done / n_total, text=f"Received {done}/{n_total} questions ...")
+
+    return json.loads("".join(chunks))
+
+
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def _generate_mcq_set(role_norm, n_domain, n_comm, slot, _role):
+    """One cached quiz per (role, counts, slot). `slot` only varies the cache key.
+
+    `_role` is the user's text as typed (acronyms like "HR" keep their case); the
+    leading underscore keeps it out of the cache key.
+    """
+    prompt = build_mcq_prompt(_role, n_domain, n_comm)
+    progress = st.progress(0.0, text="Waiting for Gemini ...")
+
+    for attempt in range(MCQ_MAX_ATTEMPTS):
+        try:
+            data = check_mcqs(_stream_mcqs(prompt, n_domain + n_comm, progress), n_domain, n_comm)
+        except ValueError as err:
+            if attempt == MCQ_MAX_ATTEMPTS - 1:
+                raise
+            prompt = (
+                build_mcq_prompt(_role, n_domain, n_comm)
+                + f"\n\nYour previous response was invalid: {err}. Return valid JSON matching schema."
+            )
+            continue
+
+        # raising keeps a rejection out of this per-slot cache
+        if not data["valid"]:
+            raise InvalidRoleError(role_norm)
+        return data
+
+
+def generate_mcqs_with_validation(role, n_domain=10, n_comm=10):
+    """Validates the role and generates its MCQs in a single Gemini call."""
+    role = role.strip()
+    role_norm = role.casefold()
+    rejected = get_rejected_roles()
+
+    strikes, first_rejected_at = rejected.get(role_norm, (0, 0.0))
+    if time.time() - first_rejected_at >= REJECTED_ROLE_TTL_SECONDS:
+        strikes, first_rejected_at = 0, time.time()
+    if strikes >= REJECTED_ROLE_STRIKES:
+        return {"valid": False}
+
+    slot = random.randrange(MCQ_POOL_SIZE)
     try:
-        res = model.generate_content(validate_prompt)
-        t = res.text.strip()
+        data = _generate_mcq_set(role_norm, n_domain, n_comm, slot, role)
+    except InvalidRoleError:
+        if len(rejected) >= REJECTED_ROLE_MAX_ENTRIES:
+            rejected.clear()
+        rejected[role_norm] = (strikes + 1, first_rejected_at)
+        return {"valid": False}
+
+    # a valid quiz outweighs any earlier rejection
+    rejected.pop(role_norm, None)
+    return data
+
+
+def _submit_mcq_batch(items):
+    """Submits one Batch API job covering every queued request."""
+    inline_requests = [
+        {
+            "contents": [{
+                "role": "user",
+                "parts": [{"text": build_mcq_prompt(role, n_domain, n_comm)}]
+            }],
+            "config": {"system_instruction": MCQ_SYSTEM_INSTRUCTION, **GENAI_MCQ_GENERATION_CONFIG}
+        }
+        for role, n_domain, n_comm, _ in items
+    ]
 
-        obj = json.loads(t[t.find("{"): t.rfind("}")+1])
-        return obj.get("valid", False)
+    batch_job = get_batch_client().batches.create(
+        model=GEMINI_MODEL,
+        src=inline_requests,
+        config={"display_name": f"intervai-mcqs-{int(time.time())}"}
+    )
+    return batch_job.name
 
-    except:
-        return False
 
+def _is_transient_batch_error(err):
+    """True for rate limits, server errors and network failures worth retrying."""
+    if isinstance(err, genai_errors.APIError):
+        return err.code == 429 or err.code >= 500
+    return isinstance(err, (httpx.TransportError, ConnectionError, TimeoutError))
 
-# -------------------- GEMINI FUNCTIONS --------------------
-def generate_mcqs(role, n_domain=10, n_comm=10):
-    prompt = f"""
-Generate {n_domain} TECHNICAL MCQs and {n_comm} COMMUNICATION MCQs
-for the job role "{role}".
-
-Return ONLY valid JSON:
-{{
- "domain": [
-   {{"q": "question text", "options": ["A","B","C","D"], "answer": 0}}
- ],
- "communication": [
-   {{"q": "question text", "options": ["A","B","C","D"], "answer": 0}}
- ]
-}}
-"""
-    res = model.generate_content(prompt)
-    text = res.text.strip()
+
+def _collect_mcq_batch(batch_job_name, items):
+    """Polls a batch job and resolves each request's future with its quiz."""
+    try:
+        _poll_mcq_batch(batch_job_name, items)
+    except Exception as err:
+        # a dead collector thread would leave every session waiting out its own deadline
+        for *_, future in items:
+            if not future.done():
+                future.set_exception(err)
+
+
+def _poll_mcq_batch(batch_job_name, items):
+    deadline = time.time() + BATCH_TIMEOUT_SECONDS
+    retry_delay = BATCH_POLL_SECONDS
+
+    while True:
+        if time.time() >= deadline:
+            # every session has stopped waiting by now; stop paying for the job too
+            for *_, future in items:
+                future.set_exception(TimeoutError(f"MCQ batch job {batch_job_name} timed out"))
+            try:
+                get_batch_client().batches.cancel(name=batch_job_name)
+            except Exception:
+                logger.exception("Could not cancel MCQ batch job %s", batch_job_name)
+            return
+
+        try:
+            batch_job = get_batch_client().batches.get(name=batch_job_name)
+        except Exception as err:
+            # the job keeps running server-side; back off before giving up on it.
+            # auth, bad-name and bad-request errors will not clear up, so fail at once
+            if _is_transient_batch_error(err) and time.time() + retry_delay < deadline:
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 60)
+                continue
+            for *_, future in items:
+                future.set_exception(err)
+            return
+
+        retry_delay = BATCH_POLL_SECONDS
+
+        # state is optional in google-genai; keep polling until it is reported
+        job_state = batch_job.state.name if batch_job.state is not None else None
+
+        # a partial success still carries per-item responses; failed items are caught below
+        if job_state in ("JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED"):
+            try:
+                # inlined responses come back in request order
+                responses = list(batch_job.dest.inlined_responses)
+            except (AttributeError, TypeError):
+                responses = []
+
+            for (_, n_domain, n_comm, future), item in zip(items, responses):
+                try:
+                    future.set_result(check_mcqs(json.loads(item.response.text), n_domain, n_comm))
+                except Exception as err:
+                    future.set_exception(err)
+
+            for *_, future in items:
+                if not future.done():
+                    future.set_exception(RuntimeError(f"MCQ batch job {batch_job_name} returned no response"))
+            return
+
+        if job_state in ("JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"):
+            for *_, future in items:
+                future.set_exception(RuntimeError(f"MCQ batch job {batch_job_name} ended with {job_state}"))
+            return
+
+        time.sleep(BATCH_POLL_SECONDS)
+
+
+def _batch_dispatch_loop(pending):
+    while True:
+        items = [pending.get()]
+        time.sleep(BATCH_WINDOW_SECONDS)
+
+        while True:
+            try:
+                items.append(pending.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            batch_job_name = _submit_mcq_batch(items)
+        except Exception as err:
+            for *_, future in items:
+                future.set_exception(err)
+            continue
+
+        # keep collecting new requests while this job runs
+        threading.Thread(target=_collect_mcq_batch, args=(batch_job_name, items), daemon=True).start()
+
+
+@st.cache_resource(show_spinner=False)
+def get_batch_queue():
+    """One queue and dispatcher thread shared by every session."""
+    pending = queue.Queue()
+    threading.Thread(target=_batch_dispatch_loop, args=(pending,), daemon=True).start()
+    return pending
+
+
+def enqueue_mcq_batch(role, n_domain=10, n_comm=10):
+    """Queues MCQ generation for the next shared batch job; returns a Future."""
+    future = Future()
+    get_batch_queue().put((role, n_domain, n_comm, future))
+    return future
+
+
+def load_prewarmed_quiz(role, n_domain=10, n_comm=10):
+    """Returns a random pre-generated quiz for `role`, if a usable one was shipped."""
+    path = QUIZ_DIR / f"{slugify(role)}.json"
+    if not path.is_file():
+        return None
 
     try:
-        return json.loads(text)
-    except:
-        start = text.find("{")
-        end = text.rfind("}")
-        return json.loads(text[start:end+1])
+        quizzes = json.loads(path.read_text(encoding="utf-8"))["quizzes"]
+        quiz = check_mcqs(random.choice(quizzes), n_domain, n_comm)
+    except (OSError, KeyError, IndexError, TypeError, ValueError):
+        # stale or hand-edited file: fall back to generating
+        return None
+
+    return quiz if quiz["valid"] else None
+
+
+def _fmt(x, opts):
+    return opts[x]
+
 
+# Marks an unanswered question in the packed answers bytearray.
+UNANSWERED = 0xFF
 
-def evaluate_answers(role, domain_qs, comm_qs, answers):
-    all_qs = domain_qs + comm_qs
 
-    tech_correct = 0
-    comm_correct = 0
-    tech_attempted = 0
-    comm_attempted = 0
+def evaluate_answers(role, domain_qs, comm_qs, answers, correct_np):
+    n_domain = len(domain_qs)
 
-    for i, q in enumerate(all_qs):
-        selected = answers.get(f"q_{i}", None)
-        correct = q["answer"]
+    selected = np.frombuffer(answers, dtype=np.uint8)
 
-        if selected is not None:
-            if i < len(domain_qs):
-                tech_attempted += 1
-            else:
-                comm_attempted += 1
+    attempted = selected != UNANSWERED
+    correct_mask = (selected == correct_np) & attempted
 
-        if selected == correct:
-            if i < len(domain_qs):
-                tech_correct += 1
-            else:
-                comm_correct += 1
+    tech_correct = int(correct_mask[:n_domain].sum())
+    comm_correct = int(correct_mask[n_domain:].sum())
+    tech_attempted = int(attempted[:n_domain].sum())
+    comm_attempted = int(attempted[n_domain:].sum())
 
     total = tech_correct + comm_correct
 
@@ -240,21 +440,65 @@ if "mcqs" not in st.session_state:
     st.session_state.mcqs = None
 
 if "answers" not in st.session_state:
-    st.session_state.answers = {}
+    st.session_state.answers = bytearray([UNANSWERED] * 20)
 
 if "evaluation" not in st.session_state:
     st.session_state.evaluation = None
 
+if "correct_np" not in st.session_state:
+    st.session_state.correct_np = None
+
+if "role_error" not in st.session_state:
+    st.session_state.role_error = None
+
+if "batch_future" not in st.session_state:
+    st.session_state.batch_future = None
+
+if "batch_deadline" not in st.session_state:
+    st.session_state.batch_deadline = None
+
+
+def return_home_with_error(message):
+    st.session_state.role_error = message
+    st.session_state.role = ""
+    st.session_state.state = "home"
+    st.rerun()
+
+
+def apply_generated_mcqs(data):
+    """Moves on to the test page, or back home if Gemini rejected the role."""
+
+    # ⚠️ VALIDATION HAPPENS IN THE SAME CALL
+    if not data.get("valid", False):
+        return_home_with_error("❌ Invalid job role! Enter a real profession.")
+
+    for q in data["domain"] + data["communication"]:
+        q["format_func"] = functools.partial(_fmt, opts=tuple(q["options"]))
+
+    st.session_state.mcqs = data
+    st.session_state.correct_np = np.array(
+        [q["answer"] for q in data["domain"] + data["communication"]], dtype=np.uint8
+    )
+    st.session_state.state = "test"
+    st.rerun()
+
 
 # -------------------- HEADER --------------------
-st.markdown("<h1 style='text-align:center;'>🤖 intervAI — AI Interview Agent</h1>", unsafe_allow_html=True)
-st.markdown("<p style='text-align:center;color:#9ca3af;'>Enter ANY job role. AI will generate 20 MCQs & evaluate you.</p>", unsafe_allow_html=True)
-st.markdown("---")
+st.markdown(
+    "<h1 style='text-align:center;'>🤖 intervAI — AI Interview Agent</h1>"
+    "<p style='text-align:center;color:#9ca3af;'>Enter ANY job role. AI will generate 20 MCQs & evaluate you.</p>"
+    "<hr>",
+    unsafe_allow_html=True
+)
 
 
 # -------------------- HOME PAGE --------------------
 if st.session_state.state == "home":
 
+    if st.session_state.role_error:
+        st.error(st.session_state.role_error)
+        st.session_state.role_error = None
+
     with st.form("role_form"):
         role = st.text_input("Enter Job Role (e.g. Software Engineer, Data Scientist)")
         start = st.form_submit_button("Start Interview")
@@ -263,12 +507,9 @@ if st.session_state.state == "home":
 
         if not role.strip():
             st.warning("Please enter a job role.")
+        elif is_obviously_invalid_role(role):
+            st.error("❌ Invalid job role! Enter a real profession.")
         else:
-            # ⚠️ VALIDATION ADDED HERE
-            if not is_valid_role(role.strip()):
-                st.error("❌ Invalid job role! Enter a real profession.")
-                st.stop()
-
             st.session_state.role = role.strip()
             st.session_state.state = "generating"
             st.rerun()
@@ -277,10 +518,51 @@ if st.session_state.state == "home":
 # -------------------- GENERATING MCQS --------------------
 if st.session_state.state == "generating":
     st.info(f"Generating 20 MCQs for **{st.session_state.role}** ...")
-    data = generate_mcqs(st.session_state.role)
-    st.session_state.mcqs = data
-    st.session_state.state = "test"
-    st.rerun()
+
+    # popular roles are served from disk without calling Gemini
+    prewarmed = load_prewarmed_quiz(st.session_state.role)
+    if prewarmed is not None:
+        apply_generated_mcqs(prewarmed)
+
+    if USE_BATCH_API:
+        st.session_state.batch_future = enqueue_mcq_batch(st.session_state.role)
+        st.session_state.batch_deadline = time.time() + BATCH_TIMEOUT_SECONDS
+        st.session_state.state = "awaiting_batch"
+        st.rerun()
+
+    try:
+        data = generate_mcqs_with_validation(st.session_state.role)
+    except Exception:
+        # the SDK also raises plain Exceptions, e.g. BlockedPromptException for a blocked role
+        logger.exception("MCQ generation failed for role %r", st.session_state.role)
+        return_home_with_error("⚠️ Could not generate questions for this role. Please try again.")
+
+    apply_generated_mcqs(data)
+
+
+# -------------------- AWAITING BATCH --------------------
+if st.session_state.state == "awaiting_batch":
+    st.info(f"Generating 20 MCQs for **{st.session_state.role}** ... (batch job queued)")
+
+    future = st.session_state.batch_future
+
+    if not future.done():
+        if time.time() < st.session_state.batch_deadline:
+            time.sleep(BATCH_POLL_SECONDS)
+            st.rerun()
+
+        # the job may still finish; its result is simply dropped
+        st.session_state.batch_future = None
+        return_home_with_error("⚠️ Generating questions took too long. Please try again.")
+
+    st.session_state.batch_future = None
+
+    try:
+        data = future.result()
+    except Exception:
+        return_home_with_error("⚠️ Could not generate questions for this role. Please try again.")
+
+    apply_generated_mcqs(data)
 
 
 # -------------------- TEST PAGE --------------------
@@ -293,29 +575,33 @@ if st.session_state.state == "test":
 
     with st.form("mcq_form"):
 
-        st.markdown("<div class='section-title'>SECTION 1 — TECHNICAL QUESTIONS</div>", unsafe_allow_html=True)
-        st.markdown("<div class='line'></div>", unsafe_allow_html=True)
+        st.markdown("<div class='section-title'>SECTION 1 — TECHNICAL QUESTIONS</div><div class='line'></div>", unsafe_allow_html=True)
 
         for i, q in enumerate(domain):
             st.markdown(f"<div class='chat-card'><div class='question'>Q{i+1}. {q['q']}</div></div>", unsafe_allow_html=True)
             key = f"q_{i}"
-            st.session_state.answers[key] = st.radio("", list(range(4)),
-                format_func=lambda x, opts=q["options"]: opts[x], key=key, index=None)
+            st.radio("", list(range(4)),
+                format_func=q["format_func"], key=key, index=None)
 
-        st.markdown("<div class='section-title'>SECTION 2 — COMMUNICATION SKILLS</div>", unsafe_allow_html=True)
-        st.markdown("<div class='line'></div>", unsafe_allow_html=True)
+        st.markdown("<div class='section-title'>SECTION 2 — COMMUNICATION SKILLS</div><div class='line'></div>", unsafe_allow_html=True)
 
         offset = len(domain)
         for j, q in enumerate(comm):
             idx = offset + j
             st.markdown(f"<div class='chat-card'><div class='question'>Q{idx+1}. {q['q']}</div></div>", unsafe_allow_html=True)
             key = f"q_{idx}"
-            st.session_state.answers[key] = st.radio("", list(range(4)),
-                format_func=lambda x, opts=q["options"]: opts[x], key=key, index=None)
+            st.radio("", list(range(4)),
+                format_func=q["format_func"], key=key, index=None)
 
         submit = st.form_submit_button("Submit Test")
 
     if submit:
+        # widget keys are the source of truth; snapshot them once
+        answers = bytearray([UNANSWERED] * (len(domain) + len(comm)))
+        for i in range(len(answers)):
+            x = st.session_state.get(f"q_{i}")
+            answers[i] = x if x is not None else UNANSWERED
+        st.session_state.answers = answers
         st.session_state.state = "evaluating"
         st.rerun()
 
@@ -327,7 +613,8 @@ if st.session_state.state == "evaluating":
         st.session_state.role,
         st.session_state.mcqs["domain"],
         st.session_state.mcqs["communication"],
-        st.session_state.answers
+        st.session_state.answers,
+        st.session_state.correct_np
     )
     st.session_state.evaluation = ev
     st.session_state.state = "result"
@@ -358,7 +645,10 @@ if st.session_state.state == "result":
     if st.button("Retake / Try Another Role"):
         st.session_state.state = "home"
         st.session_state.role = ""
-        st.session_state.answers = {}
+        st.session_state.answers = bytearray([UNANSWERED] * 20)
         st.session_state.mcqs = None
+        st.session_state.correct_np = None
+        st.session_state.batch_future = None
+        st.session_state.batch_deadline = None
         st.session_state.evaluation = None
         st.rerun()
@@ -0,0 +1,143 @@
+# mcq_spec.py (MCQ prompt, schemas and checks shared by app.py and scripts/)
+import re
+from pathlib import Path
+
+import fastjsonschema
+
+# Pre-generated quizzes for popular roles (see scripts/prewarm_quizzes.py).
+QUIZ_DIR = Path(__file__).parent / "data" / "quizzes"
+
+# Static part of the MCQ prompt, sent as the system instruction. It still goes
+# out (and is billed) with every request: it is too short for explicit context
+# caching, so keeping it here is only a refactor.
+MCQ_SYSTEM_INSTRUCTION = """
+You are an interview question generator. Each request gives a job role as
+Role: "<role>" plus the counts n_domain and n_comm.
+
+First decide if the role is a valid professional job role.
+
+Job role = A real profession like: Data Scientist, Accountant, Software Engineer, Doctor, Nurse, Teacher.
+
+Invalid = random words, greetings, names, slang, sentences, nonsense.
+
+If it is invalid, return ONLY this JSON:
+{
+ "valid": false
+}
+
+Otherwise generate n_domain TECHNICAL MCQs and n_comm COMMUNICATION MCQs
+for that job role and return ONLY valid JSON:
+{
+ "valid": true,
+ "domain": [
+   {"q": "question text", "options": ["A","B","C","D"], "answer": 0}
+ ],
+ "communication": [
+   {"q": "question text", "options": ["A","B","C","D"], "answer": 0}
+ ]
+}
+
+Keep every option short (under 60 characters), with no markdown or numbering.
+If an option is one of True, False, Yes, No, None of the above or All of the
+above, emit exactly that literal string.
+"""
+
+# Gemini response schema (OpenAPI subset). "domain"/"communication" are only
+# present when the role is valid.
+_MCQ_ITEM_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "q": {"type": "STRING"},
+        "options": {"type": "ARRAY", "items": {"type": "STRING"}, "min_items": 4, "max_items": 4},
+        "answer": {"type": "INTEGER"}
+    },
+    "required": ["q", "options", "answer"]
+}
+
+MCQ_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "valid": {"type": "BOOLEAN"},
+        "domain": {"type": "ARRAY", "items": _MCQ_ITEM_SCHEMA},
+        "communication": {"type": "ARRAY", "items": _MCQ_ITEM_SCHEMA}
+    },
+    "required": ["valid"]
+}
+
+MCQ_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": MCQ_RESPONSE_SCHEMA
+}
+
+# google-genai (batch / prewarm) only: its Schema supports max_length, which
+# google-generativeai's does not, so option strings can be capped server-side.
+MCQ_OPTION_MAX_LENGTH = 60
+
+_GENAI_MCQ_ITEM_SCHEMA = {
+    **_MCQ_ITEM_SCHEMA,
+    "properties": {
+        **_MCQ_ITEM_SCHEMA["properties"],
+        "options": {
+            **_MCQ_ITEM_SCHEMA["properties"]["options"],
+            "items": {"type": "STRING", "max_length": MCQ_OPTION_MAX_LENGTH}
+        }
+    }
+}
+
+GENAI_MCQ_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": {
+        **MCQ_RESPONSE_SCHEMA,
+        "properties": {
+            **MCQ_RESPONSE_SCHEMA["properties"],
+            "domain": {"type": "ARRAY", "items": _GENAI_MCQ_ITEM_SCHEMA},
+            "communication": {"type": "ARRAY", "items": _GENAI_MCQ_ITEM_SCHEMA}
+        }
+    }
+}
+
+# Local JSON Schema check of what Gemini returned, compiled once at startup.
+_MCQ_ITEM_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "q": {"type": "string", "minLength": 1},
+        "options": {"type": "array", "items": {"type": "string"}, "minItems": 4, "maxItems": 4},
+        "answer": {"type": "integer", "minimum": 0, "maximum": 3}
+    },
+    "required": ["q", "options", "answer"]
+}
+
+MCQ_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "valid": {"type": "boolean"},
+        "domain": {"type": "array", "items": _MCQ_ITEM_JSON_SCHEMA},
+        "communication": {"type": "array", "items": _MCQ_ITEM_JSON_SCHEMA}
+    },
+    "required": ["valid"],
+    "if": {"properties": {"valid": {"const": True}}},
+    "then": {"required": ["domain", "communication"]}
+}
+
+validate_mcq = fastjsonschema.compile(MCQ_SCHEMA)
+
+
+def build_mcq_prompt(role, n_domain=10, n_comm=10):
+    return f'Role: "{role}". n_domain={n_domain}, n_comm={n_comm}'
+
+
+def check_mcqs(data, n_domain, n_comm):
+    """Raises ValueError if `data` is not a well-formed MCQ response."""
+    validate_mcq(data)
+
+    if data["valid"]:
+        if len(data["domain"]) != n_domain:
+            raise ValueError(f"expected {n_domain} domain questions, got {len(data['domain'])}")
+        if len(data["communication"]) != n_comm:
+            raise ValueError(f"expected {n_comm} communication questions, got {len(data['communication'])}")
+
+    return data
+
+
+def slugify(role):
+    return re.sub(r"[^a-z0-9]+", "-", role.strip().casefold()).strip("-")
@@ -0,0 +1,118 @@
+# scripts/prewarm_quizzes.py (pre-generate quizzes for popular roles via the Batch API)
+#
+# Run from the repo root:  python -m scripts.prewarm_quizzes
+# Writes data/quizzes/<role-slug>.json ({"quizzes": [...]}); app.py serves a
+# random one of them without calling Gemini.
+import os
+import json
+import time
+from dotenv import load_dotenv
+from google import genai
+
+from mcq_spec import (
+    MCQ_SYSTEM_INSTRUCTION, GENAI_MCQ_GENERATION_CONFIG, QUIZ_DIR,
+    build_mcq_prompt, check_mcqs, slugify
+)
+
+POPULAR_ROLES = [
+    "Software Engineer", "Data Scientist", "Data Analyst", "Data Engineer",
+    "Machine Learning Engineer", "Frontend Developer", "Backend Developer",
+    "Full Stack Developer", "Web Developer", "Mobile App Developer",
+    "DevOps Engineer", "Cloud Engineer", "Site Reliability Engineer",
+    "Cybersecurity Analyst", "Network Engineer", "Database Administrator",
+    "QA Engineer", "Product Manager", "Project Manager", "Business Analyst",
+    "UI/UX Designer", "Graphic Designer", "Digital Marketer",
+    "Marketing Manager", "Sales Executive", "Customer Support Executive",
+    "HR Manager", "Recruiter", "Accountant", "Financial Analyst",
+    "Investment Banker", "Chartered Accountant", "Auditor",
+    "Operations Manager", "Supply Chain Manager", "Civil Engineer",
+    "Mechanical Engineer", "Electrical Engineer", "Electronics Engineer",
+    "Chemical Engineer", "Doctor", "Nurse", "Pharmacist", "Dentist",
+    "Teacher", "Lawyer", "Content Writer", "Journalist", "Architect",
+    "Hotel Manager",
+]
+
+# Several quizzes per role so returning users don't get the same one again.
+QUIZZES_PER_ROLE = 5
+POLL_SECONDS = 30
+# Batch jobs normally finish within a day; give up (and cancel) after this long.
+TIMEOUT_SECONDS = 26 * 3600
+OK_STATES = ("JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED")
+DONE_STATES = OK_STATES + ("JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED")
+
+
+def _state_name(batch_job):
+    # state is optional in google-genai
+    return batch_job.state.name if batch_job.state is not None else None
+
+
+def main():
+    load_dotenv()
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise SystemExit("Missing GEMINI_API_KEY in .env file.")
+
+    client = genai.Client(api_key=api_key)
+    model_name = os.getenv("GEMINI_MODEL", "models/gemini-2.0-flash")
+
+    inline_requests = [
+        {
+            "contents": [{"role": "user", "parts": [{"text": build_mcq_prompt(role)}]}],
+            "config": {"system_instruction": MCQ_SYSTEM_INSTRUCTION, **GENAI_MCQ_GENERATION_CONFIG}
+        }
+        for role in POPULAR_ROLES
+        for _ in range(QUIZZES_PER_ROLE)
+    ]
+
+    batch_job = client.batches.create(
+        model=model_name,
+        src=inline_requests,
+        config={"display_name": f"intervai-prewarm-{int(time.time())}"}
+    )
+    print(f"Submitted {batch_job.name} for {len(POPULAR_ROLES)} roles x {QUIZZES_PER_ROLE} quizzes")
+
+    deadline = time.time() + TIMEOUT_SECONDS
+    while _state_name(batch_job) not in DONE_STATES:
+        if time.time() >= deadline:
+            client.batches.cancel(name=batch_job.name)
+            raise SystemExit(f"Batch job {batch_job.name} timed out and was cancelled")
+
+        time.sleep(POLL_SECONDS)
+        batch_job = client.batches.get(name=batch_job.name)
+        print(f"  {_state_name(batch_job)}")
+
+    if _state_name(batch_job) not in OK_STATES:
+        raise SystemExit(f"Batch job ended with {_state_name(batch_job)}")
+
+    QUIZ_DIR.mkdir(parents=True, exist_ok=True)
+
+    # inlined responses come back in request order
+    responses = list(batch_job.dest.inlined_responses or [])
+    quizzes = {role: [] for role in POPULAR_ROLES}
+
+    for i, item in enumerate(responses[:len(inline_requests)]):
+        role = POPULAR_ROLES[i // QUIZZES_PER_ROLE]
+        try:
+            data = check_mcqs(json.loads(item.response.text), 10, 10)
+        except (AttributeError, TypeError, ValueError) as err:
+            print(f"  skipped a quiz for {role}: {err}")
+            continue
+
+        if not data["valid"]:
+            print(f"  skipped a quiz for {role}: rejected as a job role")
+            continue
+
+        quizzes[role].append(data)
+
+    for role, role_quizzes in quizzes.items():
+        if not role_quizzes:
+            print(f"  no quizzes for {role}")
+            continue
+
+        path = QUIZ_DIR / f"{slugify(role)}.json"
+        path.write_text(json.dumps({"quizzes": role_quizzes}, indent=1), encoding="utf-8")
+        print(f"  wrote {len(role_quizzes)} quizzes to {path}")
+
+
+if __name__ == "__main__":
+    main()